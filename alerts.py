@@ -1,33 +1,76 @@
 import pandas as pd
 from typing import List, Dict, Callable
+from collections import deque
 import threading
+import time
+import operator
+
+
+# Comparators available to declarative (column/op/threshold) alerts
+ALERT_OPS = {
+    'gt': operator.gt,
+    'ge': operator.ge,
+    'lt': operator.lt,
+    'le': operator.le,
+    'abs_gt': lambda value, threshold: abs(value) > threshold,
+    'abs_lt': lambda value, threshold: abs(value) < threshold,
+}
 
 
 class AlertSystem:
-    def __init__(self):
-        """Initialize alert system"""
-        self.alerts = []  # List of active alerts
-        self.alert_history = []  # History of triggered alerts
-        self.lock = threading.Lock()
+    def __init__(self, max_history: int = 1000):
+        """
+        Initialize alert system
 
-    def add_alert(self, name: str, condition_func: Callable, symbol: str = None):
+        Alerts are kept in an immutable tuple that writers replace wholesale
+        (copy-on-write), so readers never need to take the lock.
+
+        Args:
+            max_history: Maximum number of triggered alerts kept in history
+        """
+        self._alerts = ()  # Registered alerts, replaced on every change
+        self.alert_history = deque(maxlen=max_history)  # History of triggered alerts
+        self.lock = threading.Lock()  # Serializes writers only
+
+    def add_alert(self, name: str, condition_func: Callable = None, symbol: str = None,
+                  column: str = None, op: str = None, threshold: float = None):
         """
         Add a new alert
 
+        Alerts are either a condition function or a declarative
+        column/op/threshold rule, which is checked against the latest value
+        of the column without going through pandas indexing.
+
         Args:
             name: Name of the alert
             condition_func: Function that takes data and returns True if alert should trigger
             symbol: Symbol this alert applies to (optional)
+            column: Column whose latest value is compared (declarative form)
+            op: Comparator name from ALERT_OPS, e.g. 'abs_gt' (declarative form)
+            threshold: Value to compare against (declarative form)
         """
+        if column is not None:
+            if op not in ALERT_OPS:
+                raise ValueError(
+                    f"Invalid alert op: {op}. Use one of {list(ALERT_OPS)}")
+            if threshold is None:
+                raise ValueError("Declarative alerts require a threshold")
+        elif condition_func is None:
+            raise ValueError(
+                "Provide either condition_func or column/op/threshold")
+
         alert = {
             'name': name,
             'condition_func': condition_func,
             'symbol': symbol,
-            'active': True
+            'active': True,
+            'column': column,
+            'op': ALERT_OPS[op] if column is not None else None,
+            'threshold': threshold
         }
 
         with self.lock:
-            self.alerts.append(alert)
+            self._alerts = self._alerts + (alert,)
 
     def remove_alert(self, name: str):
         """
@@ -37,8 +80,8 @@ class AlertSystem:
             name: Name of the alert to remove
         """
         with self.lock:
-            self.alerts = [
-                alert for alert in self.alerts if alert['name'] != name]
+            self._alerts = tuple(
+                alert for alert in self._alerts if alert['name'] != name)
 
     def check_alerts(self, data: pd.DataFrame, symbol: str = None) -> List[Dict]:
         """
@@ -51,66 +94,149 @@ class AlertSystem:
         Returns:
             List of triggered alerts
         """
+        # Snapshot the current alerts, no lock needed
+        alerts = self._alerts
+        if not alerts:
+            return []
+
         triggered_alerts = []
+        for alert in alerts:
+            # Skip if alert is not active
+            if not alert['active']:
+                continue
 
-        with self.lock:
-            for alert in self.alerts:
-                # Skip if alert is not active
-                if not alert['active']:
-                    continue
-
-                # Skip if symbol doesn't match (when specified)
-                if alert['symbol'] and symbol and alert['symbol'] != symbol:
-                    continue
-
-                try:
-                    # Check if alert condition is met
-                    if alert['condition_func'](data):
-                        triggered_alert = {
-                            'name': alert['name'],
-                            'symbol': symbol or alert['symbol'],
-                            'timestamp': pd.Timestamp.now()
-                        }
-                        triggered_alerts.append(triggered_alert)
-
-                        # Add to history
-                        self.alert_history.append(triggered_alert)
-
-                except Exception as e:
-                    print(f"Error checking alert {alert['name']}: {e}")
+            # Skip if symbol doesn't match (when specified)
+            if alert['symbol'] and symbol and alert['symbol'] != symbol:
+                continue
+
+            try:
+                # Check if alert condition is met
+                if alert['column'] is not None:
+                    # Fast path: compare the last raw value directly
+                    if alert['column'] not in data.columns or len(data) == 0:
+                        continue
+                    arr = data[alert['column']].to_numpy(copy=False)
+                    triggered = alert['op'](arr[-1], alert['threshold'])
+                else:
+                    triggered = alert['condition_func'](data)
+
+                if triggered:
+                    triggered_alerts.append(self._record_trigger(alert, symbol))
+
+            except Exception as e:
+                print(f"Error checking alert {alert['name']}: {e}")
 
         return triggered_alerts
 
-    def get_alert_history(self) -> List[Dict]:
+    def check_scalar(self, column: str, value: float, symbol: str = None,
+                     series: pd.Series = None) -> List[Dict]:
         """
-        Get history of all triggered alerts
+        Check alerts on a column against its latest value
+
+        Declarative alerts compare the value directly, without building a
+        DataFrame. Alerts registered with a condition function still get a
+        one-column DataFrame of the series, built only if any is active.
+
+        Args:
+            column: Column the value belongs to, e.g. 'zscore'
+            value: Latest value of the column
+            symbol: Symbol to check alerts for (optional)
+            series: Full column the value came from, passed to condition
+                functions (optional, they are skipped without it)
 
         Returns:
             List of triggered alerts
         """
+        alerts = self._alerts
+        if not alerts:
+            return []
+
+        triggered_alerts = []
+        data = None
+        for alert in alerts:
+            if not alert['active']:
+                continue
+
+            # Skip if symbol doesn't match (when specified)
+            if alert['symbol'] and symbol and alert['symbol'] != symbol:
+                continue
+
+            try:
+                if alert['column'] is not None:
+                    if alert['column'] != column:
+                        continue
+                    triggered = alert['op'](value, alert['threshold'])
+                else:
+                    # Slow path, same input check_alerts would get
+                    if series is None:
+                        continue
+                    if data is None:
+                        data = pd.DataFrame({column: series})
+                    triggered = alert['condition_func'](data)
+
+                if triggered:
+                    triggered_alerts.append(self._record_trigger(alert, symbol))
+
+            except Exception as e:
+                print(f"Error checking alert {alert['name']}: {e}")
+
+        return triggered_alerts
+
+    def _record_trigger(self, alert: Dict, symbol: str = None) -> Dict:
+        """Build a triggered alert entry and add it to the history"""
+        triggered_alert = {
+            'name': alert['name'],
+            'symbol': symbol or alert['symbol'],
+            # Epoch nanoseconds, converted to datetimes only when displayed
+            'timestamp_ns': time.time_ns()
+        }
+
+        # Add to history (bounded, oldest entries drop off)
+        self.alert_history.append(triggered_alert)
+        return triggered_alert
+
+    def get_alert_history(self, as_pandas: bool = False):
+        """
+        Get history of all triggered alerts
+
+        Args:
+            as_pandas: Return a DataFrame with a UTC 'timestamp' column
+                instead of the raw list
+
+        Returns:
+            List of triggered alerts, or DataFrame if as_pandas is True
+        """
+        history = list(self.alert_history)
+        if not as_pandas:
+            return history
+
+        # Convert all timestamps in one go
+        data = pd.DataFrame(history, columns=['name', 'symbol', 'timestamp_ns'])
+        data['timestamp'] = pd.to_datetime(
+            data['timestamp_ns'], unit='ns', utc=True)
+        return data.drop(columns='timestamp_ns')
+
+    def _set_active(self, name: str, active: bool):
+        """Replace the named alert with a copy carrying the new active flag"""
         with self.lock:
-            return self.alert_history.copy()
+            self._alerts = tuple(
+                {**alert, 'active': active} if alert['name'] == name else alert
+                for alert in self._alerts)
 
     def activate_alert(self, name: str):
         """Activate an alert"""
-        with self.lock:
-            for alert in self.alerts:
-                if alert['name'] == name:
-                    alert['active'] = True
-                    break
+        self._set_active(name, True)
 
     def deactivate_alert(self, name: str):
         """Deactivate an alert"""
-        with self.lock:
-            for alert in self.alerts:
-                if alert['name'] == name:
-                    alert['active'] = False
-                    break
+        self._set_active(name, False)
 
     def get_active_alerts(self) -> List[Dict]:
         """Get list of active alerts"""
-        with self.lock:
-            return [alert for alert in self.alerts if alert['active']]
+        alerts = self._alerts
+        if not alerts:
+            return []
+        return [alert for alert in alerts if alert['active']]
 
 
 # Example usage
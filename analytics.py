@@ -1,14 +1,66 @@
 import pandas as pd
 import numpy as np
-from statsmodels.regression.linear_model import OLS
 from statsmodels.tsa.stattools import adfuller
 import warnings
 
+try:
+    from analytics_numba import rolling_zscore, rolling_corr
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
+try:
+    import bottleneck as bn
+    _HAS_BN = True
+except ImportError:
+    _HAS_BN = False
+
+
+def _align_two(asset1_prices: pd.Series, asset2_prices: pd.Series) -> tuple:
+    """
+    Align two price series by index and drop rows with missing values
+
+    Series that already share an index and have no NaNs are returned as
+    float64 arrays without building an intermediate DataFrame.
+
+    Returns:
+        Tuple of (asset1 array, asset2 array, shared index)
+    """
+    a1 = asset1_prices.to_numpy(dtype=np.float64)
+    a2 = asset2_prices.to_numpy(dtype=np.float64)
+    if asset1_prices.index.equals(asset2_prices.index) and np.isfinite(a1).all() and np.isfinite(a2).all():
+        return a1, a2, asset1_prices.index
+
+    df = pd.DataFrame(
+        {'asset1': asset1_prices, 'asset2': asset2_prices}).dropna()
+    return (df['asset1'].to_numpy(dtype=np.float64),
+            df['asset2'].to_numpy(dtype=np.float64), df.index)
+
 
 class QuantAnalytics:
-    def __init__(self):
-        """Initialize analytics engine"""
-        pass
+    def __init__(self, max_cache_entries: int = 64, dtype=np.float32):
+        """
+        Initialize analytics engine
+
+        Args:
+            max_cache_entries: Maximum number of memoized results per cache
+                (hedge ratios, ADF tests)
+            dtype: Floating point type of the rolling z-score/correlation
+                inputs. float32 halves the memory traffic of the rolling
+                kernels and is adequate because inputs are mean-centred first
+                and the kernels accumulate in float64. Hedge ratio, spread,
+                price statistics and the ADF test always use float64.
+        """
+        self.max_cache_entries = max_cache_entries
+        self.dtype = dtype
+        self._hedge_cache = {}
+        self._adf_cache = {}
+
+    def _centred(self, values: pd.Series) -> np.ndarray:
+        """Copy values into a self.dtype array with their mean removed"""
+        arr = values.to_numpy(dtype=self.dtype, copy=True)
+        arr -= self.dtype(np.nanmean(arr, dtype=np.float64))
+        return arr
 
     def calculate_price_statistics(self, data: pd.DataFrame) -> dict:
         """
@@ -27,24 +79,28 @@ class QuantAnalytics:
         if len(prices) == 0:
             return {}
 
+        # Single NumPy buffer for all reductions (ddof=1 to match pandas)
+        arr = prices.to_numpy(dtype=np.float64, copy=False)
+        n = len(arr)
+
         # Calculate returns
-        returns = prices.pct_change().dropna()
+        returns = arr[1:] / arr[:-1] - 1.0
 
         stats = {
-            'mean_price': float(prices.mean()) if not prices.empty else 0,
-            'std_price': float(prices.std()) if not prices.empty else 0,
-            'mean_return': float(returns.mean()) if not returns.empty else 0,
-            'std_return': float(returns.std()) if not returns.empty else 0,
-            'min_price': float(prices.min()) if not prices.empty else 0,
-            'max_price': float(prices.max()) if not prices.empty else 0,
-            'count': int(len(prices))
+            'mean_price': float(arr.mean()),
+            'std_price': float(arr.std(ddof=1)) if n > 1 else np.nan,
+            'mean_return': float(returns.mean()) if len(returns) else 0,
+            'std_return': float(returns.std(ddof=1)) if len(returns) > 1 else (np.nan if len(returns) else 0),
+            'min_price': float(arr.min()),
+            'max_price': float(arr.max()),
+            'count': int(n)
         }
 
         return stats
 
     def calculate_hedge_ratio(self, asset1_prices: pd.Series, asset2_prices: pd.Series) -> float:
         """
-        Calculate hedge ratio using OLS regression
+        Calculate hedge ratio using the closed-form OLS slope
         Hedge ratio = β where asset1 = α + β * asset2 + ε
 
         Formula: β = Cov(asset1, asset2) / Var(asset2)
@@ -56,34 +112,43 @@ class QuantAnalytics:
         Returns:
             Hedge ratio (β coefficient)
         """
+        if len(asset1_prices) < 2 or len(asset2_prices) < 2:
+            return 0.0
+
+        # Reruns usually pass the same prices again
+        key = (len(asset1_prices), asset1_prices.index[0], asset1_prices.index[-1],
+               float(asset1_prices.iloc[-1]), float(asset2_prices.iloc[-1]))
+        if key in self._hedge_cache:
+            return self._hedge_cache[key]
+
+        hedge_ratio = self._fit_hedge_ratio(asset1_prices, asset2_prices)
+
+        if len(self._hedge_cache) >= self.max_cache_entries:
+            self._hedge_cache.pop(next(iter(self._hedge_cache)))
+        self._hedge_cache[key] = hedge_ratio
+        return hedge_ratio
+
+    def _fit_hedge_ratio(self, asset1_prices: pd.Series, asset2_prices: pd.Series) -> float:
+        """Closed-form OLS slope of asset1 on asset2, see calculate_hedge_ratio"""
         # Align data by index
-        df = pd.DataFrame(
-            {'asset1': asset1_prices, 'asset2': asset2_prices}).dropna()
+        a1, a2, _ = _align_two(asset1_prices, asset2_prices)
 
-        if len(df) < 2:
+        # Drop rows where either asset is not finite
+        mask = np.isfinite(a1) & np.isfinite(a2)
+        if not mask.all():
+            a1 = a1[mask]
+            a2 = a2[mask]
+
+        if len(a1) < 2:
             return 0.0
 
-        try:
-            # Use statsmodels OLS
-            X = df['asset2']
-            y = df['asset1']
-
-            # Add constant
-            X = pd.concat([pd.Series([1]*len(X), index=X.index), X], axis=1)
-            X.columns = ['const', 'asset2']
-
-            # Fit OLS model
-            model = OLS(y, X).fit()
-            hedge_ratio = model.params['asset2']  # β coefficient
-            return float(hedge_ratio)
-        except Exception as e:
-            # Fallback to manual calculation
-            try:
-                cov = np.cov(df['asset1'], df['asset2'])[0, 1]
-                var = np.var(df['asset2'])
-                return float(cov / var) if var != 0 else 0.0
-            except:
-                return 0.0
+        a2m = a2.mean()
+        var = ((a2 - a2m) ** 2).sum()
+        if var == 0:
+            return 0.0
+
+        beta = ((a1 - a1.mean()) * (a2 - a2m)).sum() / var
+        return float(beta)
 
     def calculate_spread(self, asset1_prices: pd.Series, asset2_prices: pd.Series, hedge_ratio: float) -> pd.Series:
         """
@@ -99,15 +164,13 @@ class QuantAnalytics:
             Series with spread values
         """
         # Align data by index
-        df = pd.DataFrame(
-            {'asset1': asset1_prices, 'asset2': asset2_prices}).dropna()
+        a1, a2, index = _align_two(asset1_prices, asset2_prices)
 
-        if df.empty:
+        if len(a1) == 0:
             return pd.Series(dtype=float)
 
         # Calculate spread
-        spread = df['asset1'] - hedge_ratio * df['asset2']
-        return spread
+        return pd.Series(a1 - hedge_ratio * a2, index=index)
 
     def calculate_zscore(self, series: pd.Series, window: int = 20) -> pd.Series:
         """
@@ -124,16 +187,44 @@ class QuantAnalytics:
         if len(series) < window or window <= 0:
             return pd.Series([np.nan] * len(series), index=series.index) if len(series) > 0 else pd.Series(dtype=float)
 
-        # Calculate rolling statistics
-        rolling_mean = series.rolling(window=window).mean()
-        rolling_std = series.rolling(window=window).std()
+        # Centre the data so the running sums don't lose precision
+        # (z-score is shift invariant)
+        xc = self._centred(series)
+        finite = np.isfinite(xc).all()
+
+        if _HAS_NUMBA and finite:
+            return pd.Series(rolling_zscore(xc, window), index=series.index)
+
+        if _HAS_BN:
+            # Bottleneck leaves windows containing NaN as NaN, like pandas
+            m = bn.move_mean(xc, window, min_count=window)
+            s = bn.move_std(xc, window, min_count=window, ddof=1)
+            zscore = (xc - m) / np.where(s == 0, np.nan, s)
+            return pd.Series(zscore, index=series.index)
+
+        # Cumulative sums can't skip gaps, let pandas handle NaN windows
+        if not finite:
+            rolling_mean = series.rolling(window=window).mean()
+            rolling_std = series.rolling(window=window).std().replace(0, np.nan)
+            return (series - rolling_mean) / rolling_std
+
+        # Rolling mean/variance from cumulative sums in a single O(N) sweep
+        cs = np.concatenate(([0.0], np.cumsum(xc, dtype=np.float64)))
+        cs2 = np.concatenate(
+            ([0.0], np.cumsum(np.square(xc, dtype=np.float64))))
+        m = (cs[window:] - cs[:-window]) / window
+        v = (cs2[window:] - cs2[:-window]) / window - m * m
+
+        # Sample std (ddof=1) to match pandas
+        if window > 1:
+            s = np.sqrt(np.maximum(v * window / (window - 1), 0))
+        else:
+            s = np.full(len(m), np.nan)
 
         # Avoid division by zero
-        rolling_std = rolling_std.replace(0, np.nan)
-
-        # Calculate z-score
-        zscore = (series - rolling_mean) / rolling_std
-        return zscore
+        zscore = np.full(len(xc), np.nan)
+        zscore[window - 1:] = (xc[window - 1:] - m) / np.where(s == 0, np.nan, s)
+        return pd.Series(zscore, index=series.index)
 
     def calculate_correlation(self, asset1_prices: pd.Series, asset2_prices: pd.Series, window: int = 20) -> pd.Series:
         """
@@ -154,10 +245,114 @@ class QuantAnalytics:
         if len(df) < window or window <= 0:
             return pd.Series([np.nan] * len(df), index=df.index) if len(df) > 0 else pd.Series(dtype=float)
 
+        if _HAS_NUMBA or _HAS_BN:
+            # Correlation is shift invariant, centre to keep the sums precise
+            a = self._centred(df['asset1'])
+            b = self._centred(df['asset2'])
+
+        if _HAS_NUMBA:
+            return pd.Series(rolling_corr(a, b, window), index=df.index)
+
+        if _HAS_BN:
+            # Pearson correlation from five moving means
+            ma = bn.move_mean(a, window, min_count=window)
+            mb = bn.move_mean(b, window, min_count=window)
+            mab = bn.move_mean(a * b, window, min_count=window)
+            maa = bn.move_mean(a * a, window, min_count=window)
+            mbb = bn.move_mean(b * b, window, min_count=window)
+            var = (maa - ma * ma) * (mbb - mb * mb)
+            correlation = (mab - ma * mb) / np.sqrt(np.where(var > 0, var, np.nan))
+            return pd.Series(correlation, index=df.index)
+
         # Calculate rolling correlation
         correlation = df['asset1'].rolling(window=window).corr(df['asset2'])
         return correlation
 
+    def update_rolling(self, state: dict, asset1_prices: pd.Series, asset2_prices: pd.Series,
+                       window: int = 20, refit_every: int = 100) -> dict:
+        """
+        Incrementally update spread, z-score and correlation for a growing
+        price history
+
+        Only rows from the last processed one onwards are computed (the last
+        bar is redone since it may still be open), each from the window - 1
+        rows before it, so a call costs O(new rows + window). Rows dropped
+        from the front of a bounded history are dropped from the state too.
+        The hedge ratio is held fixed between refits; a full refit happens on
+        the first call, when the window changes, when the history no longer
+        overlaps the end of the previous one, or once refit_every rows have
+        been added since the last fit.
+
+        Args:
+            state: State from a previous call, updated in place ({} to start)
+            asset1_prices: Full price history of first asset
+            asset2_prices: Full price history of second asset
+            window: Rolling window size
+            refit_every: Number of new rows after which the hedge ratio is refitted
+
+        Returns:
+            The state dict, with 'hedge_ratio' and 'spread'/'zscore'/'correlation'
+            arrays covering the whole history on 'index'
+        """
+        a1, a2, index = _align_two(asset1_prices, asset2_prices)
+        n = len(a1)
+        last_len = state.get('last_len', 0)
+
+        # Rows of the previous history still present, after any rows that
+        # fell off its front (e.g. evicted from a full ring buffer)
+        kept = 0
+        if state.get('window') == window and last_len > 0 and n > 0:
+            prev_index = state['index']
+            offset = int(prev_index.searchsorted(index[0]))
+            kept = last_len - offset
+            if not (0 < kept <= n and prev_index[offset] == index[0]
+                    and index[kept - 1] == prev_index[last_len - 1]):
+                kept = 0
+
+        can_extend = kept > 0 and state['since_fit'] + n - kept < refit_every
+
+        if can_extend:
+            for key in ('spread', 'zscore', 'correlation'):
+                state[key] = state[key][offset:]
+            state['since_fit'] += n - kept
+
+            # Redo the last (possibly still open) row and append the new ones
+            start = kept - 1
+            new_spread = a1[start:] - state['hedge_ratio'] * a2[start:]
+            spread = np.concatenate((state['spread'][:start], new_spread))
+
+            # Z-scores of the new rows only need the window - 1 values before them
+            lo = max(start - window + 1, 0)
+            tail = self.calculate_zscore(
+                pd.Series(spread[lo:]), window).to_numpy()
+            state['spread'] = spread
+            state['zscore'] = np.concatenate(
+                (state['zscore'][:start], tail[start - lo:]))
+
+            # Correlation of the prices doesn't depend on the fit
+            tail = self.calculate_correlation(
+                pd.Series(a1[lo:]), pd.Series(a2[lo:]), window).to_numpy()
+            state['correlation'] = np.concatenate(
+                (state['correlation'][:start], tail[start - lo:]))
+        else:
+            hedge_ratio = self.calculate_hedge_ratio(
+                asset1_prices, asset2_prices)
+            spread = a1 - hedge_ratio * a2
+            state.clear()
+            state.update({
+                'window': window,
+                'since_fit': 0,
+                'hedge_ratio': hedge_ratio,
+                'spread': spread,
+                'zscore': self.calculate_zscore(pd.Series(spread), window).to_numpy(),
+                'correlation': self.calculate_correlation(
+                    pd.Series(a1), pd.Series(a2), window).to_numpy()
+            })
+
+        state['last_len'] = n
+        state['index'] = index
+        return state
+
     def perform_adf_test(self, series: pd.Series) -> dict:
         """
         Perform Augmented Dickey-Fuller test for stationarity
@@ -170,14 +365,26 @@ class QuantAnalytics:
         """
         series_clean = series.dropna()
 
-        if len(series_clean) < 10:
-            return {'error': 'Insufficient data for ADF test (need at least 10 points)'}
+        # Leaves enough rows for the lagged regression below
+        if len(series_clean) < 20:
+            return {'error': 'Insufficient data for ADF test (need at least 20 points)'}
+
+        # Reruns usually test the same spread again
+        n = len(series_clean)
+        key = (n, float(series_clean.iloc[0]), float(series_clean.iloc[-1]))
+        if key in self._adf_cache:
+            return self._adf_cache[key]
+
+        # Small fixed lag length (cube root of the sample size) instead of
+        # an AIC search over every lag up to Schwert's bound
+        maxlag = int((n - 1) ** (1 / 3))
 
         try:
             # Suppress warnings from statsmodels
             with warnings.catch_warnings():
                 warnings.simplefilter("ignore")
-                adf_result = adfuller(series_clean)
+                adf_result = adfuller(
+                    series_clean.to_numpy(dtype=np.float64), maxlag=maxlag, autolag=None, regression='c')
 
             result = {
                 'adf_statistic': float(adf_result[0]),
@@ -187,6 +394,9 @@ class QuantAnalytics:
                 'is_stationary': bool(adf_result[1] < 0.05)
             }
 
+            if len(self._adf_cache) >= self.max_cache_entries:
+                self._adf_cache.pop(next(iter(self._adf_cache)))
+            self._adf_cache[key] = result
             return result
         except Exception as e:
             return {'error': f'ADF test failed: {str(e)}'}
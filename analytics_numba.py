@@ -0,0 +1,193 @@
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def rolling_zscore(x, w):
+    """
+    Rolling z-score with running sums (O(1) per step)
+
+    Args:
+        x: 1D float64 array without NaNs (ideally mean-centred)
+        w: Rolling window size
+
+    Returns:
+        Array of z-scores, NaN for the first w-1 points
+    """
+    n = len(x)
+    out = np.full(n, np.nan)
+    if w < 2 or n < w:
+        return out
+
+    s = 0.0
+    s2 = 0.0
+    for i in range(n):
+        s += x[i]
+        s2 += x[i] * x[i]
+        if i >= w:
+            s -= x[i - w]
+            s2 -= x[i - w] * x[i - w]
+        if i >= w - 1:
+            mean = s / w
+            # Sample variance (ddof=1) to match pandas
+            var = (s2 - s * mean) / (w - 1)
+            if var > 0:
+                out[i] = (x[i] - mean) / np.sqrt(var)
+    return out
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def rolling_corr(a, b, w):
+    """
+    Rolling Pearson correlation with running sums (O(1) per step)
+
+    Args:
+        a: 1D float64 array without NaNs (ideally mean-centred)
+        b: 1D float64 array without NaNs, same length as a
+        w: Rolling window size
+
+    Returns:
+        Array of correlations, NaN for the first w-1 points
+    """
+    n = len(a)
+    out = np.full(n, np.nan)
+    if w < 2 or n < w:
+        return out
+
+    sa = 0.0
+    sb = 0.0
+    saa = 0.0
+    sbb = 0.0
+    sab = 0.0
+    for i in range(n):
+        sa += a[i]
+        sb += b[i]
+        saa += a[i] * a[i]
+        sbb += b[i] * b[i]
+        sab += a[i] * b[i]
+        if i >= w:
+            j = i - w
+            sa -= a[j]
+            sb -= b[j]
+            saa -= a[j] * a[j]
+            sbb -= b[j] * b[j]
+            sab -= a[j] * b[j]
+        if i >= w - 1:
+            cov = sab - sa * sb / w
+            var_a = saa - sa * sa / w
+            var_b = sbb - sb * sb / w
+            if var_a > 0 and var_b > 0:
+                out[i] = cov / np.sqrt(var_a * var_b)
+    return out
+
+
+@njit(cache=True, nogil=True)
+def ohlcv_bucket(ts_ns, px, qty, bucket_ns):
+    """
+    Aggregate time-sorted ticks into fixed-width OHLCV bars in one pass
+
+    Args:
+        ts_ns: 1D int64 array of tick timestamps in ns, ascending
+        px: 1D float64 array of prices
+        qty: 1D float64 array of quantities
+        bucket_ns: Bar width in ns
+
+    Returns:
+        Tuple of (bar start ns, open, high, low, close, volume), one entry per
+        bar between the first and last tick, empty bars have NaN prices and
+        zero volume like pandas resample
+    """
+    n = len(ts_ns)
+    if n == 0:
+        empty = np.empty(0)
+        return np.empty(0, dtype=np.int64), empty, empty, empty, empty, empty
+
+    b0 = ts_ns[0] // bucket_ns
+    nb = ts_ns[n - 1] // bucket_ns - b0 + 1
+    starts = (np.arange(nb) + b0) * bucket_ns
+    o = np.full(nb, np.nan)
+    h = np.full(nb, np.nan)
+    l = np.full(nb, np.nan)
+    c = np.full(nb, np.nan)
+    v = np.zeros(nb)
+    for i in range(n):
+        k = ts_ns[i] // bucket_ns - b0
+        p = px[i]
+        if np.isnan(o[k]):
+            o[k] = p
+            h[k] = p
+            l[k] = p
+        else:
+            if p > h[k]:
+                h[k] = p
+            if p < l[k]:
+                l[k] = p
+        c[k] = p
+        v[k] += qty[i]
+    return starts, o, h, l, c, v
+
+
+@njit(cache=True, nogil=True)
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling
+
+    Args:
+        x: 1D float64 array of ascending x values
+        y: 1D float64 array of y values, NaN points are only kept as a
+            bucket's fallback
+        n_out: Number of points to keep (at least 3)
+
+    Returns:
+        Sorted int64 array of the selected positions, first and last included
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0] = 0
+    out[n_out - 1] = n - 1
+    every = (n - 2) / (n_out - 2)
+    a = 0
+    for i in range(n_out - 2):
+        # Average of the next bucket is the third triangle vertex
+        start = int((i + 1) * every) + 1
+        end = min(int((i + 2) * every) + 1, n)
+        avg_x = 0.0
+        avg_y = 0.0
+        cnt = 0
+        for j in range(start, end):
+            if not np.isnan(y[j]):
+                avg_x += x[j]
+                avg_y += y[j]
+                cnt += 1
+        if cnt > 0:
+            avg_x /= cnt
+            avg_y /= cnt
+        else:
+            avg_x = x[end - 1]
+            avg_y = y[a]
+
+        # Point of this bucket spanning the largest triangle with a and avg
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1
+        best = lo
+        best_area = -1.0
+        for j in range(lo, hi):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best_area = area
+                best = j
+        out[i + 1] = best
+        a = best
+    return out
+
+
+# Compile on import so the first dashboard request doesn't pay for it; the
+# rolling kernels for both float types QuantAnalytics.dtype may use
+for _dtype in (np.float64, np.float32):
+    rolling_zscore(np.zeros(4, dtype=_dtype), 2)
+    rolling_corr(np.zeros(4, dtype=_dtype), np.zeros(4, dtype=_dtype), 2)
+ohlcv_bucket(np.zeros(4, dtype=np.int64), np.zeros(4), np.zeros(4), 1)
+lttb_indices(np.arange(8.0), np.zeros(8), 4)
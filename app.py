@@ -1,17 +1,24 @@
 from dashboard import Dashboard
 from alerts import AlertSystem
 from analytics import QuantAnalytics
-from storage import DataStore
+from storage import DataStore, write_csv
 from ingestion import BinanceDataStream
 import asyncio
+import csv
 import threading
 import time
+import numpy as np
 import pandas as pd
 import streamlit as st
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 
 # Global variables for data sharing
 data_store = None
@@ -20,6 +27,176 @@ alert_system = None
 symbols = ['BTCUSDT', 'ETHUSDT']
 timeframes = ['1s', '1min', '5min']
 
+# Tick batching: queued ticks are stored in batches of up to TICK_BATCH_SIZE
+# ticks or TICK_FLUSH_INTERVAL seconds, resample at most every RESAMPLE_INTERVAL
+TICK_BATCH_SIZE = 256
+TICK_FLUSH_INTERVAL = 0.1
+RESAMPLE_INTERVAL = 0.1
+
+# Fragments rerun only themselves on their own widget interactions
+# (st.experimental_fragment before Streamlit 1.37, plain call before 1.33)
+_fragment = getattr(st, 'fragment', None) or getattr(
+    st, 'experimental_fragment', None) or (lambda func: func)
+
+
+def _data_key(data: pd.DataFrame) -> tuple:
+    """Cheap freshness key for resampled data: (length, last timestamp)"""
+    if data.empty or 'timestamp' not in data.columns:
+        return (0, None)
+    return (len(data), data['timestamp'].iloc[-1])
+
+
+@st.cache_data(ttl=2, max_entries=64, show_spinner=False)
+def _compute_analytics(symbol: str, timeframe: str, rolling_window: int, data_key: tuple,
+                       _price_data: pd.DataFrame, _symbol1_data: pd.DataFrame,
+                       _symbol2_data: pd.DataFrame, _spread_state: dict) -> tuple:
+    """
+    Compute dashboard analytics for the selected symbol and the symbol pair
+
+    Streamlit does not hash the underscore-prefixed arguments, so the cache
+    is keyed on (symbol, timeframe, rolling_window, data_key) only. On a
+    cache miss the spread, z-score and correlation are advanced
+    incrementally from _spread_state rather than recomputed over the whole
+    history.
+
+    Args:
+        symbol: Selected symbol (cache key)
+        timeframe: Selected timeframe (cache key)
+        rolling_window: Rolling window size
+        data_key: Freshness key of the three inputs, see _data_key
+        _price_data: Resampled data of the selected symbol
+        _symbol1_data: Resampled data of the first symbol of the pair
+        _symbol2_data: Resampled data of the second symbol of the pair
+        _spread_state: Incremental spread state for this pair/timeframe/window,
+            updated in place (see QuantAnalytics.update_rolling)
+
+    Returns:
+        Tuple of (stats, spread, zscore, correlation, hedge_ratio)
+    """
+    spread_data = pd.Series(dtype=float)
+    zscore_data = pd.Series(dtype=float)
+    correlation_data = pd.Series(dtype=float)
+    hedge_ratio = None
+
+    # Get price data for analytics
+    price_data = pd.DataFrame({'price': _price_data['close']})
+    stats = analytics.calculate_price_statistics(price_data)
+
+    if not _symbol1_data.empty and not _symbol2_data.empty and 'close' in _symbol1_data.columns and 'close' in _symbol2_data.columns:
+        # Align the pair on bar timestamps, so the derived series come back
+        # with a DatetimeIndex
+        asset1_prices = pd.Series(_symbol1_data['close'].to_numpy(dtype=float),
+                                  index=pd.DatetimeIndex(_symbol1_data['timestamp']))
+        asset2_prices = pd.Series(_symbol2_data['close'].to_numpy(dtype=float),
+                                  index=pd.DatetimeIndex(_symbol2_data['timestamp']))
+        asset1_prices, asset2_prices = asset1_prices.align(
+            asset2_prices, join='inner')
+
+        if len(asset1_prices) > 1:  # Need at least 2 points for calculations
+            try:
+                # Calculate hedge ratio, spread, z-score and correlation, only
+                # processing bars added since the previous run
+                state = analytics.update_rolling(
+                    _spread_state, asset1_prices, asset2_prices, rolling_window)
+                hedge_ratio = state['hedge_ratio']
+                spread_data = pd.Series(state['spread'], index=state['index'])
+                if len(spread_data) >= rolling_window:
+                    zscore_data = pd.Series(
+                        state['zscore'], index=state['index'])
+                    correlation_data = pd.Series(
+                        state['correlation'], index=state['index'])
+            except Exception as e:
+                print(f"Analytics calculation error: {e}")
+
+    return stats, spread_data, zscore_data, correlation_data, hedge_ratio
+
+
+@_fragment
+def _render_alert_section(dashboard: Dashboard, zscore_data: pd.Series, symbol: str):
+    """
+    Alert controls and triggered alerts, rerun on their own
+
+    Args:
+        dashboard: Dashboard renderer
+        zscore_data: Z-score series of the pair
+        symbol: Selected symbol
+    """
+    # Render alert controls
+    alert_threshold, alert_active = dashboard.render_alert_controls()
+
+    # Check alerts if active
+    triggered_alerts = []
+    if alert_active and not zscore_data.empty and len(zscore_data) > 0:
+        triggered_alerts = alert_system.check_scalar(
+            'zscore', float(zscore_data.iloc[-1]), symbol, series=zscore_data)
+
+    # Render alerts
+    dashboard.render_alerts(triggered_alerts)
+
+
+@_fragment
+def _render_adf_section(dashboard: Dashboard, spread_data: pd.Series):
+    """
+    ADF test button and results, rerun on their own
+
+    Args:
+        dashboard: Dashboard renderer
+        spread_data: Spread series to test
+    """
+    st.subheader("Statistical Tests")
+    if st.button("Run ADF Test on Spread"):
+        if not spread_data.empty:
+            adf_results = analytics.perform_adf_test(spread_data)
+            dashboard.render_adf_results(adf_results)
+        else:
+            st.warning("Not enough data for ADF test")
+
+
+@_fragment
+def _render_export_section(dashboard: Dashboard, symbol: str, timeframe: str,
+                           resampled_data: pd.DataFrame, stats: dict,
+                           zscore_data: pd.Series, correlation_data: pd.Series):
+    """
+    Export buttons, rerun on their own
+
+    Args:
+        dashboard: Dashboard renderer
+        symbol: Selected symbol
+        timeframe: Selected timeframe
+        resampled_data: Resampled data of the selected symbol
+        stats: Price statistics
+        zscore_data: Z-score series of the pair
+        correlation_data: Rolling correlation of the pair
+    """
+    export_price, export_analytics = dashboard.render_export_controls()
+
+    if export_price:
+        filename = f"price_data_{symbol}_{timeframe}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        write_csv(resampled_data, filename)
+        st.success(f"Price data exported to {filename}")
+
+    if export_analytics:
+        # Create analytics summary
+        summary = {
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'mean_price': stats.get('mean_price', 0),
+            'std_price': stats.get('std_price', 0),
+            'mean_return': stats.get('mean_return', 0),
+            'std_return': stats.get('std_return', 0),
+            'latest_zscore': float(zscore_data.iloc[-1]) if not zscore_data.empty else 0,
+            'latest_correlation': float(correlation_data.iloc[-1]) if not correlation_data.empty else 0
+        }
+        filename = f"analytics_{symbol}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+
+        # Single row, write it directly (NaN as empty field like to_csv)
+        with open(filename, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(summary.keys())
+            writer.writerow('' if isinstance(value, float) and np.isnan(value) else value
+                            for value in summary.values())
+        st.success(f"Analytics data exported to {filename}")
+
 
 class QuantApp:
     def __init__(self):
@@ -39,43 +216,95 @@ class QuantApp:
         self.running = False
         self.data_thread = None
 
+        # Incoming ticks, the stream's bounded queue (set on the data collection loop)
+        self._tick_q = None
+
+        # Resample throttle (monotonic clock, immune to wall-clock jumps)
+        self._last_resample = 0.0
+        self._resample_pending = False
+
     def _setup_default_alerts(self):
         """Setup default alert conditions"""
-        def zscore_alert(data):
-            if len(data) == 0 or 'zscore' not in data.columns:
-                return False
-            latest_zscore = data['zscore'].iloc[-1] if len(data) > 0 else 0
-            return abs(latest_zscore) > 2.0
-
         # Add alert only if not already added
         if not alert_system.get_active_alerts():
-            alert_system.add_alert("Z-Score Alert (>2)", zscore_alert)
-
-    async def _handle_tick_data(self, tick_data):
-        """
-        Handle incoming tick data
+            alert_system.add_alert(
+                "Z-Score Alert (>2)", column='zscore', op='abs_gt', threshold=2.0)
 
-        Args:
-            tick_data: Dictionary with tick information
-        """
+    async def _drain_ticks(self):
+        """Move queued ticks into the data store in batches"""
         global data_store
-        # Store tick data
-        data_store.add_tick(tick_data)
+        loop = asyncio.get_running_loop()
+
+        while True:
+            # Don't let throttled ticks sit unresampled, or queued rows
+            # unwritten, when the stream goes quiet
+            try:
+                flush_wait = data_store.flush_if_due()
+            except Exception as e:
+                print(f"Error writing queued rows: {e}")
+                # Retry once another interval has passed
+                flush_wait = data_store.db_flush_interval
+            waits = [w for w in (RESAMPLE_INTERVAL if self._resample_pending else None,
+                                 flush_wait) if w is not None]
+            try:
+                tick = await asyncio.wait_for(
+                    self._tick_q.get(), min(waits) if waits else None)
+            except asyncio.TimeoutError:
+                try:
+                    self._maybe_resample()
+                except Exception as e:
+                    print(f"Error resampling ticks: {e}")
+                continue
 
-        # Resample data periodically
-        data_store.resample_data()
+            # Collect up to TICK_BATCH_SIZE ticks within TICK_FLUSH_INTERVAL
+            batch = [tick]
+            deadline = loop.time() + TICK_FLUSH_INTERVAL
+            while len(batch) < TICK_BATCH_SIZE:
+                try:
+                    batch.append(self._tick_q.get_nowait())
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._tick_q.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+
+            try:
+                # Store tick data
+                data_store.add_ticks_batch(batch)
+
+                # Resample data periodically
+                self._resample_pending = True
+                self._maybe_resample()
+            except Exception as e:
+                print(f"Error storing tick batch: {e}")
+
+    def _maybe_resample(self):
+        """Resample stored ticks, at most once every RESAMPLE_INTERVAL seconds"""
+        global data_store
+        now = time.monotonic()
+        if now - self._last_resample > RESAMPLE_INTERVAL:
+            data_store.resample_data()
+            self._last_resample = now
+            self._resample_pending = False
 
     def _data_collection_loop(self):
         """Run data collection in a separate thread"""
         global symbols
 
-        # Create new event loop for this thread
-        loop = asyncio.new_event_loop()
+        # Create new event loop for this thread (libuv-backed when available)
+        loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
 
         # Create data stream
         data_stream = BinanceDataStream(symbols)
-        data_stream.add_callback(self._handle_tick_data)
+
+        # Batch-writer drains the stream's bounded queue directly, a full
+        # queue drops the oldest ticks
+        self._tick_q = data_stream.tick_queue
+        loop.create_task(self._drain_ticks())
 
         try:
             loop.run_until_complete(data_stream.start_streams())
@@ -141,129 +370,54 @@ class QuantApp:
         spread_data = pd.Series(dtype=float)
         zscore_data = pd.Series(dtype=float)
         correlation_data = pd.Series(dtype=float)
-        adf_results = {}
 
         if not resampled_data.empty and 'close' in resampled_data.columns:
-            # Get price data for analytics
-            price_data = pd.DataFrame({'price': resampled_data['close']})
-            stats = analytics.calculate_price_statistics(price_data)
+            symbol1_data = pd.DataFrame()
+            symbol2_data = pd.DataFrame()
 
-            # Calculate spread and z-score if we have multiple symbols
+            # Get the pair used for spread and z-score if we have multiple symbols
             if len(symbols) >= 2:
                 try:
                     symbol1_data = data_store.get_resampled_data(
                         selected_timeframe, symbols[0])
                     symbol2_data = data_store.get_resampled_data(
                         selected_timeframe, symbols[1])
-
-                    if not symbol1_data.empty and not symbol2_data.empty and 'close' in symbol1_data.columns and 'close' in symbol2_data.columns:
-                        # Align data lengths
-                        min_len = min(len(symbol1_data), len(symbol2_data))
-                        if min_len > 1:  # Need at least 2 points for calculations
-                            asset1_prices = symbol1_data['close'].tail(min_len)
-                            asset2_prices = symbol2_data['close'].tail(min_len)
-
-                            # Reset indices to align data
-                            asset1_prices = asset1_prices.reset_index(
-                                drop=True)
-                            asset2_prices = asset2_prices.reset_index(
-                                drop=True)
-
-                            # Calculate hedge ratio and spread
-                            try:
-                                hedge_ratio = analytics.calculate_hedge_ratio(
-                                    asset1_prices, asset2_prices)
-                                spread_data = analytics.calculate_spread(
-                                    asset1_prices, asset2_prices, hedge_ratio)
-
-                                # Calculate z-score
-                                if len(spread_data) >= rolling_window and len(spread_data) > 0:
-                                    zscore_data = analytics.calculate_zscore(
-                                        spread_data, rolling_window)
-
-                                # Calculate correlation
-                                if len(asset1_prices) >= rolling_window:
-                                    correlation_data = analytics.calculate_correlation(
-                                        asset1_prices, asset2_prices, rolling_window
-                                    )
-                            except Exception as e:
-                                print(f"Analytics calculation error: {e}")
                 except Exception as e:
                     print(f"Error getting symbol data: {e}")
 
+            # Incremental spread state survives reruns in the session
+            if 'analytics_cache' not in st.session_state:
+                st.session_state.analytics_cache = {}
+            spread_state = st.session_state.analytics_cache.setdefault(
+                (tuple(symbols[:2]), selected_timeframe, rolling_window), {})
+
+            # Reruns without new bars produce the same key and hit the cache
+            data_key = tuple(_data_key(df) for df in (
+                resampled_data, symbol1_data, symbol2_data))
+            stats, spread_data, zscore_data, correlation_data, _ = _compute_analytics(
+                selected_symbol, selected_timeframe, rolling_window, data_key,
+                resampled_data, symbol1_data, symbol2_data, spread_state)
+
         # Render charts
         dashboard.render_price_chart(resampled_data, selected_symbol)
 
         if not spread_data.empty and len(spread_data) > 1:
-            # Ensure index is datetime for proper plotting
-            if not isinstance(spread_data.index, pd.DatetimeIndex):
-                spread_data.index = pd.date_range(
-                    start=pd.Timestamp.now(), periods=len(spread_data), freq='1min')
             dashboard.render_spread_chart(spread_data)
 
         if not zscore_data.empty and len(zscore_data) > 1:
-            # Ensure index is datetime for proper plotting
-            if not isinstance(zscore_data.index, pd.DatetimeIndex):
-                zscore_data.index = pd.date_range(
-                    start=pd.Timestamp.now(), periods=len(zscore_data), freq='1min')
             dashboard.render_zscore_chart(zscore_data)
 
         if not correlation_data.empty and len(correlation_data) > 1:
-            # Ensure index is datetime for proper plotting
-            if not isinstance(correlation_data.index, pd.DatetimeIndex):
-                correlation_data.index = pd.date_range(
-                    start=pd.Timestamp.now(), periods=len(correlation_data), freq='1min')
             dashboard.render_correlation_chart(correlation_data)
 
         # Render statistics
         dashboard.render_stats_table(stats)
 
-        # Render alert controls
-        alert_threshold, alert_active = dashboard.render_alert_controls()
-
-        # Check alerts if active
-        triggered_alerts = []
-        if alert_active and not zscore_data.empty and len(zscore_data) > 0:
-            # Create temporary DataFrame for alert checking
-            alert_data = pd.DataFrame({'zscore': zscore_data})
-            triggered_alerts = alert_system.check_alerts(
-                alert_data, selected_symbol)
-
-        # Render alerts
-        dashboard.render_alerts(triggered_alerts)
-
-        # ADF Test section
-        st.subheader("Statistical Tests")
-        if st.button("Run ADF Test on Spread"):
-            if not spread_data.empty:
-                adf_results = analytics.perform_adf_test(spread_data)
-                dashboard.render_adf_results(adf_results)
-            else:
-                st.warning("Not enough data for ADF test")
-
-        # Render export controls
-        export_price, export_analytics = dashboard.render_export_controls()
-
-        if export_price:
-            filename = f"price_data_{selected_symbol}_{selected_timeframe}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            resampled_data.to_csv(filename, index=False)
-            st.success(f"Price data exported to {filename}")
-
-        if export_analytics:
-            # Create analytics summary
-            analytics_summary = pd.DataFrame([{
-                'symbol': selected_symbol,
-                'timeframe': selected_timeframe,
-                'mean_price': stats.get('mean_price', 0),
-                'std_price': stats.get('std_price', 0),
-                'mean_return': stats.get('mean_return', 0),
-                'std_return': stats.get('std_return', 0),
-                'latest_zscore': zscore_data.iloc[-1] if not zscore_data.empty else 0,
-                'latest_correlation': correlation_data.iloc[-1] if not correlation_data.empty else 0
-            }])
-            filename = f"analytics_{selected_symbol}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            analytics_summary.to_csv(filename, index=False)
-            st.success(f"Analytics data exported to {filename}")
+        # Alerts, ADF test and export only rerun their own fragment on clicks
+        _render_alert_section(dashboard, zscore_data, selected_symbol)
+        _render_adf_section(dashboard, spread_data)
+        _render_export_section(dashboard, selected_symbol, selected_timeframe, resampled_data,
+                               stats, zscore_data, correlation_data)
 
         # Auto-refresh
         if st.checkbox("Auto-refresh", value=True):
@@ -4,6 +4,189 @@ import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 import numpy as np
+import inspect
+
+try:
+    from analytics_numba import lttb_indices
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
+# Charts are downsampled to about this many points before plotting
+MAX_CHART_POINTS = 2000
+# Price histories longer than this many bars are drawn with WebGL line
+# segments instead of SVG candlesticks; a symbol's share of the default
+# resampled store (2000 bars per timeframe) gets there
+WEBGL_CANDLE_BARS = 500
+# WebGL candles are still downsampled to this many bars for larger stores
+MAX_WEBGL_POINTS = 10000
+
+# Stable chart keys keep charts mounted across reruns; st.plotly_chart only
+# takes a key from Streamlit 1.35, before that it would go to Plotly
+_CHART_KEYS = 'key' in inspect.signature(st.plotly_chart).parameters
+
+
+def _plotly_chart(fig: go.Figure, key: str):
+    """
+    Show a figure full width, under a stable key where Streamlit supports one
+
+    Args:
+        fig: Plotly figure
+        key: Element key, reused on every rerun
+    """
+    if _CHART_KEYS:
+        st.plotly_chart(fig, use_container_width=True, key=key)
+    else:
+        st.plotly_chart(fig, use_container_width=True)
+
+
+def _downsample(x, y: np.ndarray, n_out: int = MAX_CHART_POINTS) -> np.ndarray:
+    """
+    Positions of the points to plot, LTTB when Numba is available, otherwise
+    evenly spaced
+
+    Args:
+        x: Datetime-like or numeric x values, ascending
+        y: Values the shape is judged on
+        n_out: Number of points to keep
+
+    Returns:
+        Sorted array of positions into x and y
+    """
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+    if _HAS_NUMBA:
+        x = np.asarray(x)
+        if np.issubdtype(x.dtype, np.datetime64):
+            x = x.astype('datetime64[ns]').view('i8')
+        elif not np.issubdtype(x.dtype, np.number):
+            x = np.arange(n)
+        return lttb_indices(x.astype(np.float64), np.asarray(y, dtype=np.float64), n_out)
+    return np.unique(np.linspace(0, n - 1, n_out).astype(np.int64))
+
+
+def _series_key(data) -> tuple:
+    """Cheap freshness key for a chart input: (length, first/last label, last row values)"""
+    if len(data) == 0:
+        return (0, None, None, None)
+    if isinstance(data, pd.DataFrame):
+        # The open bar's open/high/low can change while its close doesn't
+        return (len(data), data['timestamp'].iloc[0], data['timestamp'].iloc[-1],
+                tuple(data[['open', 'high', 'low', 'close']].iloc[-1]))
+    return (len(data), data.index[0], data.index[-1], data.iloc[-1])
+
+
+def _candle_segments(data: pd.DataFrame) -> list:
+    """
+    Candles as Scattergl line segments: a thin wick and a thick body per
+    bar, one trace each for rising and falling bars
+
+    Args:
+        data: DataFrame with OHLCV data
+
+    Returns:
+        List of four Scattergl traces
+    """
+    traces = []
+    up = (data['close'] >= data['open']).to_numpy()
+    for rising, color in ((True, '#26a69a'), (False, '#ef5350')):
+        part = data[up == rising]
+        # Each segment is (x, y0), (x, y1), then a NaN gap to break the line
+        x = np.repeat(part['timestamp'].to_numpy(), 3)
+        gap = np.full(len(part), np.nan)
+        for lo, hi, width in (('low', 'high', 1), ('open', 'close', 5)):
+            y = np.column_stack([part[lo].to_numpy(), part[hi].to_numpy(), gap]).ravel()
+            traces.append(go.Scattergl(
+                x=x, y=y, mode='lines', line=dict(color=color, width=width),
+                connectgaps=False, hoverinfo='skip' if width == 1 else None,
+                showlegend=False
+            ))
+    return traces
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _build_candlestick(data_key: tuple, symbol: str, _data: pd.DataFrame) -> go.Figure:
+    """
+    Build the candlestick figure, cached on (data_key, symbol)
+
+    Args:
+        data_key: Freshness key of _data, see _series_key
+        symbol: Symbol being displayed
+        _data: DataFrame with OHLCV data (not hashed)
+
+    Returns:
+        Plotly figure
+    """
+    if len(_data) > WEBGL_CANDLE_BARS:
+        # Keep the bars LTTB picks on the close
+        _data = _data.iloc[_downsample(_data['timestamp'].values, _data['close'].values,
+                                       MAX_WEBGL_POINTS)]
+        fig = go.Figure(data=_candle_segments(_data))
+    else:
+        fig = go.Figure(data=[go.Candlestick(
+            x=_data['timestamp'],
+            open=_data['open'],
+            high=_data['high'],
+            low=_data['low'],
+            close=_data['close'],
+            name=symbol
+        )])
+
+    fig.update_layout(
+        title=f"{symbol} Price Chart",
+        xaxis_title="Time",
+        yaxis_title="Price (USDT)",
+        height=400,
+        # Same revision across reruns keeps the user's zoom and pan
+        uirevision=symbol
+    )
+    return fig
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _build_line(data_key: tuple, name: str, title: str, yaxis_title: str,
+                hlines: tuple, _series: pd.Series) -> go.Figure:
+    """
+    Build a single line chart with horizontal reference lines, cached on
+    everything but the series itself
+
+    Args:
+        data_key: Freshness key of _series, see _series_key
+        name: Trace name
+        title: Chart title
+        yaxis_title: Y axis title
+        hlines: Tuple of (y, line_dash, line_color, annotation_text or None)
+        _series: Series to plot (not hashed)
+
+    Returns:
+        Plotly figure
+    """
+    _series = _series.iloc[_downsample(_series.index.values, _series.values)]
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=_series.index,
+        y=_series.values,
+        mode='lines',
+        name=name
+    ))
+
+    for y, dash, color, text in hlines:
+        if text:
+            fig.add_hline(y=y, line_dash=dash, line_color=color,
+                          annotation_text=text)
+        else:
+            fig.add_hline(y=y, line_dash=dash, line_color=color)
+
+    fig.update_layout(
+        title=title,
+        xaxis_title="Time",
+        yaxis_title=yaxis_title,
+        height=300,
+        uirevision=title
+    )
+    return fig
 
 
 class Dashboard:
@@ -56,23 +239,10 @@ class Dashboard:
             st.warning("No price data available")
             return
 
-        fig = go.Figure(data=[go.Candlestick(
-            x=data['timestamp'],
-            open=data['open'],
-            high=data['high'],
-            low=data['low'],
-            close=data['close'],
-            name=symbol
-        )])
-
-        fig.update_layout(
-            title=f"{symbol} Price Chart",
-            xaxis_title="Time",
-            yaxis_title="Price (USDT)",
-            height=400
-        )
-
-        st.plotly_chart(fig, use_container_width=True)
+        fig = _build_candlestick(_series_key(data), symbol, data)
+        # Stable key, Streamlit updates the existing chart in place instead of
+        # remounting it
+        _plotly_chart(fig, 'price_chart')
 
     def render_spread_chart(self, spread_data: pd.Series):
         """
@@ -85,25 +255,11 @@ class Dashboard:
             st.warning("No spread data available")
             return
 
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=spread_data.index,
-            y=spread_data.values,
-            mode='lines',
-            name='Spread'
-        ))
+        # Zero line
+        fig = _build_line(_series_key(spread_data), 'Spread', "Spread Between Assets", "Spread",
+                          ((0, "dash", "red", None),), spread_data)
 
-        # Add zero line
-        fig.add_hline(y=0, line_dash="dash", line_color="red")
-
-        fig.update_layout(
-            title="Spread Between Assets",
-            xaxis_title="Time",
-            yaxis_title="Spread",
-            height=300
-        )
-
-        st.plotly_chart(fig, use_container_width=True)
+        _plotly_chart(fig, 'spread_chart')
 
     def render_zscore_chart(self, zscore_data: pd.Series):
         """
@@ -116,29 +272,13 @@ class Dashboard:
             st.warning("No z-score data available")
             return
 
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=zscore_data.index,
-            y=zscore_data.values,
-            mode='lines',
-            name='Z-Score'
-        ))
-
-        # Add threshold lines
-        fig.add_hline(y=2, line_dash="dash", line_color="orange",
-                      annotation_text="Upper Threshold")
-        fig.add_hline(y=-2, line_dash="dash", line_color="orange",
-                      annotation_text="Lower Threshold")
-        fig.add_hline(y=0, line_dash="solid", line_color="gray")
-
-        fig.update_layout(
-            title="Z-Score Analysis",
-            xaxis_title="Time",
-            yaxis_title="Z-Score",
-            height=300
-        )
+        # Threshold lines
+        fig = _build_line(_series_key(zscore_data), 'Z-Score', "Z-Score Analysis", "Z-Score",
+                          ((2, "dash", "orange", "Upper Threshold"),
+                           (-2, "dash", "orange", "Lower Threshold"),
+                           (0, "solid", "gray", None)), zscore_data)
 
-        st.plotly_chart(fig, use_container_width=True)
+        _plotly_chart(fig, 'zscore_chart')
 
     def render_correlation_chart(self, correlation_data: pd.Series):
         """
@@ -151,29 +291,15 @@ class Dashboard:
             st.warning("No correlation data available")
             return
 
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=correlation_data.index,
-            y=correlation_data.values,
-            mode='lines',
-            name='Correlation'
-        ))
-
-        # Add benchmark lines
-        fig.add_hline(y=0.8, line_dash="dot", line_color="green",
-                      annotation_text="Strong Correlation")
-        fig.add_hline(y=0, line_dash="solid", line_color="gray")
-        fig.add_hline(y=-0.8, line_dash="dot", line_color="green",
-                      annotation_text="Strong Negative Correlation")
-
-        fig.update_layout(
-            title="Rolling Correlation",
-            xaxis_title="Time",
-            yaxis_title="Correlation",
-            height=300
-        )
+        # Benchmark lines
+        fig = _build_line(_series_key(correlation_data), 'Correlation', "Rolling Correlation",
+                          "Correlation",
+                          ((0.8, "dot", "green", "Strong Correlation"),
+                           (0, "solid", "gray", None),
+                           (-0.8, "dot", "green", "Strong Negative Correlation")),
+                          correlation_data)
 
-        st.plotly_chart(fig, use_container_width=True)
+        _plotly_chart(fig, 'correlation_chart')
 
     def render_stats_table(self, stats: dict):
         """
@@ -188,9 +314,9 @@ class Dashboard:
 
         st.subheader("Summary Statistics")
 
-        # Convert stats to DataFrame for display
-        stats_df = pd.DataFrame([stats])
-        st.dataframe(stats_df.round(6), use_container_width=True)
+        # One-row table straight from a dict of lists, no DataFrame needed
+        st.dataframe({k: [round(v, 6) if isinstance(v, (int, float, np.number)) else v]
+                      for k, v in stats.items()}, use_container_width=True)
 
     def render_alert_controls(self):
         """
@@ -222,8 +348,9 @@ class Dashboard:
         if triggered_alerts:
             st.subheader("Recent Alerts")
             for alert in triggered_alerts[-5:]:  # Show last 5 alerts
+                timestamp = pd.Timestamp(alert['timestamp_ns'], unit='ns', tz='UTC')
                 st.warning(
-                    f"🚨 {alert['name']} triggered for {alert['symbol']} at {alert['timestamp']}")
+                    f"🚨 {alert['name']} triggered for {alert['symbol']} at {timestamp}")
         else:
             st.info("No alerts triggered")
 
@@ -1,72 +1,115 @@
 import asyncio
 import websockets
 import json
-import pandas as pd
 from typing import List, Callable
 import traceback
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 
 class BinanceDataStream:
-    def __init__(self, symbols: List[str]):
+    def __init__(self, symbols: List[str], queue_size: int = 10000):
         """
         Initialize Binance data stream for given symbols
 
         Args:
             symbols: List of trading symbols (e.g., ['BTCUSDT', 'ETHUSDT'])
+            queue_size: Max ticks buffered between the socket and its consumer,
+                the oldest tick is dropped when full
         """
         self.symbols = symbols
+        self.queue_size = queue_size
+        # Ticks from the socket; consumed by the callbacks, or directly by the
+        # caller when no callbacks are registered
+        self.tick_queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped_ticks = 0
         self.websocket_url = "wss://stream.binance.com:9443/ws"
+        # Combined streams multiplex all symbols over one connection
+        self.combined_url = "wss://stream.binance.com:9443/stream"
         self.data_callbacks = []
 
     def add_callback(self, callback: Callable):
         """Add a callback function to receive tick data"""
         self.data_callbacks.append(callback)
 
-    async def connect_single_stream(self, symbol: str):
-        """Connect to a single symbol stream"""
-        stream_name = f"{symbol.lower()}@trade"
-        url = f"{self.websocket_url}/{stream_name}"
-
+    async def connect_combined_stream(self):
+        """Connect to one combined stream carrying the trades of all symbols"""
+        streams = "/".join(f"{symbol.lower()}@trade" for symbol in self.symbols)
+        url = f"{self.combined_url}?streams={streams}"
+        stream_symbols = {f"{symbol.lower()}@trade": symbol for symbol in self.symbols}
+
+        attempt = 0
+        while True:
+            try:
+                async with websockets.connect(url) as websocket:
+                    print(f"Connected to combined stream for {', '.join(self.symbols)}")
+                    attempt = 0
+                    while True:
+                        try:
+                            message = await websocket.recv()
+                            msg = _loads(message)
+                            data = msg['data']
+
+                            # Extract relevant fields, the trade time stays
+                            # int ms since epoch and is converted per batch
+                            tick_data = {
+                                'timestamp': int(data['T']),
+                                'symbol': stream_symbols.get(msg['stream'], data['s']),
+                                'price': float(data['p']),
+                                'quantity': float(data['q'])
+                            }
+
+                            # Hand off to _dispatch, never wait on callbacks here
+                            self._enqueue(tick_data)
+
+                        except websockets.exceptions.ConnectionClosed:
+                            print("Combined stream closed, reconnecting...")
+                            break
+                        except Exception as e:
+                            print(f"Error processing message: {e}")
+                            traceback.print_exc()
+
+            except Exception as e:
+                print(f"Error connecting to combined stream: {e}")
+                traceback.print_exc()
+
+            # Exponential backoff between reconnects, capped at 30 seconds
+            await asyncio.sleep(min(2 ** attempt, 30))
+            attempt += 1
+
+    def _enqueue(self, tick_data: dict):
+        """Queue a tick for the callbacks, dropping the oldest one when full"""
         try:
-            async with websockets.connect(url) as websocket:
-                print(f"Connected to {symbol} stream")
-                while True:
-                    try:
-                        message = await websocket.recv()
-                        data = json.loads(message)
-
-                        # Extract relevant fields
-                        tick_data = {
-                            'timestamp': pd.to_datetime(data['T'], unit='ms'),
-                            'symbol': data['s'],
-                            'price': float(data['p']),
-                            'quantity': float(data['q'])
-                        }
-
-                        # Call all registered callbacks
-                        for callback in self.data_callbacks:
-                            try:
-                                await callback(tick_data)
-                            except Exception as e:
-                                print(f"Error in callback: {e}")
-                                traceback.print_exc()
-
-                    except websockets.exceptions.ConnectionClosed:
-                        print(
-                            f"Connection closed for {symbol}, reconnecting...")
-                        break
-                    except Exception as e:
-                        print(f"Error processing message for {symbol}: {e}")
-                        traceback.print_exc()
-
-        except Exception as e:
-            print(f"Error connecting to {symbol}: {e}")
-            traceback.print_exc()
+            self.tick_queue.put_nowait(tick_data)
+        except asyncio.QueueFull:
+            self.tick_queue.get_nowait()
+            self.tick_queue.put_nowait(tick_data)
+            self.dropped_ticks += 1
+
+    async def _dispatch(self):
+        """Run registered callbacks for queued ticks"""
+        while True:
+            tick_data = await self.tick_queue.get()
+
+            # Call all registered callbacks
+            for callback in self.data_callbacks:
+                try:
+                    await callback(tick_data)
+                except Exception as e:
+                    print(f"Error in callback: {e}")
+                    traceback.print_exc()
 
     async def start_streams(self):
-        """Start streams for all symbols"""
-        tasks = [self.connect_single_stream(symbol) for symbol in self.symbols]
-        await asyncio.gather(*tasks)
+        """Start a single multiplexed stream for all symbols and its dispatcher"""
+        if not self.data_callbacks:
+            # The caller reads tick_queue itself
+            await self.connect_combined_stream()
+            return
+        await asyncio.gather(self.connect_combined_stream(), self._dispatch())
 
     def stop_streams(self):
         """Stop all streams (placeholder for future implementation)"""
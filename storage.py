@@ -1,37 +1,147 @@
 import pandas as pd
+import numpy as np
 import sqlite3
 from typing import Dict, List
 import threading
 import time
 
+try:
+    from analytics_numba import ohlcv_bucket
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+
+
+# Column order used for batched database inserts
+TICK_COLUMNS = ('timestamp', 'symbol', 'price', 'quantity')
+OHLCV_COLUMNS = ('timestamp', 'symbol', 'open',
+                 'high', 'low', 'close', 'volume')
+
+# Bar width per timeframe in ns; bars start at multiples of the width since
+# the epoch, same as pandas resample for widths that divide a day
+BUCKET_NS = {
+    '1s': 1_000_000_000,
+    '1min': 60_000_000_000,
+    '5min': 300_000_000_000
+}
+
+def _to_datetime64(timestamps: list) -> np.ndarray:
+    """
+    Convert tick timestamps to datetime64[ns] in one vectorized step
+
+    Args:
+        timestamps: Int ms since epoch (as sent by Binance) or datetime-likes
+
+    Returns:
+        datetime64[ns] array
+    """
+    if timestamps and isinstance(timestamps[0], (int, np.integer)):
+        return np.asarray(timestamps, dtype=np.int64).astype('datetime64[ms]').astype('datetime64[ns]')
+    return pd.to_datetime(timestamps).values
+
+
+def _db_timestamps(ts: np.ndarray) -> np.ndarray:
+    """
+    Format datetime64 values the way pandas to_sql stores them in SQLite
+
+    Args:
+        ts: datetime64 array
+
+    Returns:
+        Strings like '2023-11-14 22:13:20.100000', whole seconds without
+        the fraction
+    """
+    text = np.char.replace(np.datetime_as_string(ts, unit='us'), 'T', ' ')
+    return np.char.replace(text, '.000000', '')
+
+
+def write_csv(data: pd.DataFrame, filepath: str):
+    """
+    Write a DataFrame to CSV without its index, with Arrow's C++ writer when
+    pyarrow is installed
+
+    Args:
+        data: DataFrame to write
+        filepath: Path to save CSV file
+    """
+    if pa is not None:
+        pacsv.write_csv(pa.Table.from_pandas(data, preserve_index=False), filepath)
+    else:
+        data.to_csv(filepath, index=False)
+
 
 class DataStore:
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, tick_capacity: int = 10000,
+                 db_batch_size: int = 500, db_flush_interval: float = 1.0,
+                 resampled_capacity: int = 2000):
         """
-        Initialize data store with optional SQLite persistence
+        Initialize data store with optional SQLite or DuckDB persistence
 
         Args:
-            db_path: Path to SQLite database file (optional)
+            db_path: Path to the database file (optional), a '.duckdb' path
+                uses DuckDB when it is installed, anything else SQLite
+            tick_capacity: Number of most recent ticks kept in memory
+            db_batch_size: Number of queued rows that triggers a database write
+            db_flush_interval: Maximum seconds rows stay queued before a write
+            resampled_capacity: Number of most recent bars kept per timeframe
         """
-        # In-memory storage for tick data
-        self.tick_data = pd.DataFrame(
-            columns=['timestamp', 'symbol', 'price', 'quantity'])
-
-        # Resampled data storage
-        self.resampled_data = {
-            '1s': pd.DataFrame(columns=['timestamp', 'symbol', 'open', 'high', 'low', 'close', 'volume']),
-            '1min': pd.DataFrame(columns=['timestamp', 'symbol', 'open', 'high', 'low', 'close', 'volume']),
-            '5min': pd.DataFrame(columns=['timestamp', 'symbol', 'open', 'high', 'low', 'close', 'volume'])
-        }
-
-        # Lock for thread-safe operations
+        # In-memory ring buffer for tick data, one preallocated array per
+        # column; the oldest ticks are overwritten once it is full
+        self._cap = tick_capacity
+        self._idx = 0  # Next write position
+        self._size = 0  # Number of valid ticks
+        self._ts = np.empty(tick_capacity, dtype='datetime64[ns]')
+        self._px = np.empty(tick_capacity, dtype=np.float64)
+        self._qty = np.empty(tick_capacity, dtype=np.float64)
+        self._sym = np.empty(tick_capacity, dtype=np.int32)  # Codes, see _sym_code
+        # Total ticks ever written, bumped before the slots are overwritten
+        self._written = 0
+
+        # Resampled bars per timeframe in a preallocated ring of typed arrays,
+        # symbols stored as int codes; see _new_ohlcv_ring
+        self._resampled_cap = resampled_capacity
+        self._sym_codes = {}
+        self._sym_names = []
+        self._sym_lock = threading.Lock()
+        self._ohlcv_ring = {tf: self._new_ohlcv_ring(resampled_capacity)
+                            for tf in ('1s', '1min', '5min')}
+        # Guards in-place ring updates against concurrent materialization
+        self._ohlcv_lock = threading.Lock()
+
+        # Lock for writers; readers only take it to snapshot the ring position
         self.lock = threading.Lock()
+        # Serializes resample_data callers, which own the resampled rings
+        self._resample_lock = threading.Lock()
 
-        # SQLite database connection (optional)
+        # SQLite or DuckDB database connection (optional)
         self.db_path = db_path
         self.conn = None
+        self._duckdb = bool(db_path) and db_path.endswith('.duckdb') and duckdb is not None
+
+        # Rows waiting to be written, per table, in one transaction
+        self.db_batch_size = db_batch_size
+        self.db_flush_interval = db_flush_interval
+        self._pending = {'ticks': []}
+        self._pending.update(
+            {f'resampled_{tf}': [] for tf in self._ohlcv_ring})
+        self._pending_count = 0
+        self._last_flush = time.monotonic()
         if db_path:
-            self.conn = sqlite3.connect(db_path, check_same_thread=False)
+            if self._duckdb:
+                self.conn = duckdb.connect(db_path)
+            else:
+                self.conn = sqlite3.connect(db_path, check_same_thread=False)
             self._initialize_db()
 
         # Last resample timestamps
@@ -40,52 +150,41 @@ class DataStore:
             '1min': pd.Timestamp.now(),
             '5min': pd.Timestamp.now()
         }
+        # Start of each symbol's latest (possibly still open) bar per
+        # timeframe as int ns by symbol code, ticks before it are already
+        # folded into the resampled rings
+        self._last_resampled_ts = {tf: {} for tf in BUCKET_NS}
 
     def _initialize_db(self):
         """Initialize database tables"""
         if self.conn:
             cursor = self.conn.cursor()
-            cursor.execute('''
+            if not self._duckdb:
+                # No fsync per commit, writes are batched anyway
+                cursor.execute('PRAGMA journal_mode=WAL')
+                cursor.execute('PRAGMA synchronous=NORMAL')
+            # DuckDB's REAL is a 4-byte float, use DOUBLE and a real TIMESTAMP there
+            ts_type, num_type = ('TIMESTAMP', 'DOUBLE') if self._duckdb else ('TEXT', 'REAL')
+            cursor.execute(f'''
                 CREATE TABLE IF NOT EXISTS ticks (
-                    timestamp TEXT,
+                    timestamp {ts_type},
                     symbol TEXT,
-                    price REAL,
-                    quantity REAL
-                )
-            ''')
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS resampled_1s (
-                    timestamp TEXT,
-                    symbol TEXT,
-                    open REAL,
-                    high REAL,
-                    low REAL,
-                    close REAL,
-                    volume REAL
-                )
-            ''')
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS resampled_1min (
-                    timestamp TEXT,
-                    symbol TEXT,
-                    open REAL,
-                    high REAL,
-                    low REAL,
-                    close REAL,
-                    volume REAL
-                )
-            ''')
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS resampled_5min (
-                    timestamp TEXT,
-                    symbol TEXT,
-                    open REAL,
-                    high REAL,
-                    low REAL,
-                    close REAL,
-                    volume REAL
+                    price {num_type},
+                    quantity {num_type}
                 )
             ''')
+            for tf in self._ohlcv_ring:
+                cursor.execute(f'''
+                    CREATE TABLE IF NOT EXISTS resampled_{tf} (
+                        timestamp {ts_type},
+                        symbol TEXT,
+                        open {num_type},
+                        high {num_type},
+                        low {num_type},
+                        close {num_type},
+                        volume {num_type}
+                    )
+                ''')
             self.conn.commit()
 
     def add_tick(self, tick_data: Dict):
@@ -93,22 +192,192 @@ class DataStore:
         Add a new tick to the data store
 
         Args:
-            tick_data: Dictionary with keys 'timestamp', 'symbol', 'price', 'quantity'
+            tick_data: Dictionary with keys 'timestamp', 'symbol', 'price', 'quantity',
+                timestamp either datetime-like or int ms since epoch
         """
         with self.lock:
-            # Add to in-memory DataFrame
-            new_row = pd.DataFrame([tick_data])
-            self.tick_data = pd.concat(
-                [self.tick_data, new_row], ignore_index=True)
+            # Write in place at the ring position, no copying
+            i = self._idx
+            self._written += 1
+            self._ts[i] = _to_datetime64([tick_data['timestamp']])[0]
+            self._sym[i] = self._sym_code(tick_data['symbol'])
+            self._px[i] = tick_data['price']
+            self._qty[i] = tick_data['quantity']
+            self._idx = (i + 1) % self._cap
+            self._size = min(self._size + 1, self._cap)
+
+            # Optionally save to database
+            if self.conn:
+                self._queue_rows('ticks', (
+                    _db_timestamps(self._ts[i:i + 1]),
+                    np.array([tick_data['symbol']], dtype=object),
+                    self._px[i:i + 1].copy(), self._qty[i:i + 1].copy()))
+
+    def add_ticks_batch(self, ticks: List[Dict]):
+        """
+        Add a batch of ticks to the data store
+
+        Args:
+            ticks: List of dictionaries with keys 'timestamp', 'symbol', 'price', 'quantity',
+                timestamp either datetime-like or int ms since epoch
+        """
+        if not ticks:
+            return
 
-            # Keep only recent data to prevent memory issues
-            if len(self.tick_data) > 10000:
-                self.tick_data = self.tick_data.tail(5000)
+        self._append_ticks(
+            _to_datetime64([tick['timestamp'] for tick in ticks]),
+            np.array([tick['symbol'] for tick in ticks], dtype=object),
+            np.array([tick['price'] for tick in ticks], dtype=np.float64),
+            np.array([tick['quantity'] for tick in ticks], dtype=np.float64))
+
+    def _append_ticks(self, ts: np.ndarray, sym: np.ndarray, px: np.ndarray, qty: np.ndarray):
+        """Write a batch of ticks into the ring buffer (and database)"""
+        with self.lock:
+            # Only the newest _cap ticks of a batch can survive
+            n = min(len(ts), self._cap)
+            pos = (self._idx + np.arange(n)) % self._cap
+            self._written += n
+            self._ts[pos] = ts[-n:]
+            self._sym[pos] = [self._sym_code(s) for s in sym[-n:].tolist()]
+            self._px[pos] = px[-n:]
+            self._qty[pos] = qty[-n:]
+            self._idx = (self._idx + n) % self._cap
+            self._size = min(self._size + n, self._cap)
 
             # Optionally save to database
             if self.conn:
-                new_row.to_sql('ticks', self.conn,
-                               if_exists='append', index=False)
+                self._queue_rows('ticks', (
+                    _db_timestamps(ts), sym, px, qty))
+
+    def _queue_rows(self, table: str, columns: tuple):
+        """
+        Queue rows for a database table and write them once a batch is due
+
+        Rows stay as column arrays until the write, no per-row tuples.
+        Caller must hold self.lock.
+
+        Args:
+            table: Table name, a key of self._pending
+            columns: Equal-length arrays in TICK_COLUMNS or OHLCV_COLUMNS order
+        """
+        self._pending[table].append(columns)
+        self._pending_count += len(columns[0])
+        if (self._pending_count >= self.db_batch_size
+                or time.monotonic() - self._last_flush >= self.db_flush_interval):
+            self._flush_pending()
+
+    def flush_if_due(self):
+        """
+        Write queued rows if db_flush_interval has passed since the last write
+
+        _queue_rows only checks the interval when new rows arrive, call this
+        while the stream is quiet.
+
+        Returns:
+            Seconds until queued rows are due, None if nothing is queued
+        """
+        with self.lock:
+            if not (self.conn and self._pending_count):
+                return None
+            remaining = self.db_flush_interval - (time.monotonic() - self._last_flush)
+            if remaining > 0:
+                return remaining
+            self._flush_pending()
+            return None
+
+    def _flush_pending(self):
+        """Write all queued rows in a single transaction (caller holds self.lock)"""
+        if self.conn and self._duckdb and self._pending_count:
+            # Columnar bulk insert, DuckDB scans the registered Arrow table
+            # (or DataFrame) straight from the queued arrays
+            self.conn.begin()
+            try:
+                for table, chunks in self._pending.items():
+                    if chunks:
+                        columns = TICK_COLUMNS if table == 'ticks' else OHLCV_COLUMNS
+                        data = {name: np.concatenate([chunk[k] for chunk in chunks])
+                                for k, name in enumerate(columns)}
+                        batch = pa.table(data) if pa is not None else pd.DataFrame(data)
+                        self.conn.register('batch', batch)
+                        try:
+                            self.conn.execute(
+                                f"INSERT INTO {table}({','.join(columns)}) "
+                                f"SELECT CAST(timestamp AS TIMESTAMP), {','.join(columns[1:])} FROM batch")
+                        finally:
+                            self.conn.unregister('batch')
+                self.conn.commit()
+            except Exception:
+                # Like `with self.conn` for SQLite, never leave the transaction open
+                self.conn.rollback()
+                raise
+        elif self.conn and self._pending_count:
+            with self.conn:
+                for table, chunks in self._pending.items():
+                    if chunks:
+                        columns = TICK_COLUMNS if table == 'ticks' else OHLCV_COLUMNS
+                        for chunk in chunks:
+                            self.conn.executemany(
+                                f"INSERT INTO {table}({','.join(columns)}) "
+                                f"VALUES ({','.join('?' * len(columns))})",
+                                zip(*(col.tolist() for col in chunk)))
+        else:
+            return
+        # Only drop the queued rows once the transaction committed, a failed
+        # write keeps them for the next flush
+        for chunks in self._pending.values():
+            chunks.clear()
+        self._pending_count = 0
+        self._last_flush = time.monotonic()
+
+    def _ticks_frame(self, symbol: str = None, limit: int = None) -> pd.DataFrame:
+        """
+        Materialize buffered ticks as a DataFrame in chronological order
+
+        Only the ring position is read under self.lock, the copy itself runs
+        without blocking the writer. Caller must not hold self.lock.
+
+        Args:
+            symbol: Filter by symbol (optional)
+            limit: Only return this many most recent ticks (optional)
+        """
+        with self.lock:
+            idx, size, written = self._idx, self._size, self._written
+
+        if size < self._cap:
+            order = np.arange(size)
+        else:
+            # Oldest tick sits at the write position once the buffer wrapped
+            order = np.arange(idx, idx + self._cap) % self._cap
+
+        ts = self._ts[order]
+        sym = self._sym[order]
+        px = self._px[order]
+        qty = self._qty[order]
+
+        # Drop the oldest rows if a concurrent write wrapped over them
+        overrun = self._written - written - (self._cap - size)
+        if overrun > 0:
+            ts, sym, px, qty = ts[overrun:], sym[overrun:], px[overrun:], qty[overrun:]
+
+        if symbol:
+            mask = sym == self._sym_codes.get(symbol, -1)
+            ts, sym, px, qty = ts[mask], sym[mask], px[mask], qty[mask]
+        if limit is not None:
+            start = max(len(ts) - limit, 0) if limit > 0 else len(ts)
+            ts, sym, px, qty = ts[start:], sym[start:], px[start:], qty[start:]
+
+        # Symbols come back categorical, straight from the stored codes
+        return pd.DataFrame({
+            'timestamp': ts,
+            'symbol': pd.Categorical.from_codes(sym, categories=list(self._sym_names)),
+            'price': px,
+            'quantity': qty
+        })
+
+    @property
+    def tick_data(self) -> pd.DataFrame:
+        """All buffered ticks as a DataFrame, oldest first"""
+        return self._ticks_frame()
 
     def get_latest_ticks(self, symbol: str = None, limit: int = 1000) -> pd.DataFrame:
         """
@@ -121,11 +390,7 @@ class DataStore:
         Returns:
             DataFrame with tick data
         """
-        with self.lock:
-            data = self.tick_data.copy()
-            if symbol:
-                data = data[data['symbol'] == symbol]
-            return data.tail(limit)
+        return self._ticks_frame(symbol, limit)
 
     def resample_data(self, symbol: str = None):
         """
@@ -134,80 +399,64 @@ class DataStore:
         Args:
             symbol: Resample data for specific symbol (optional, resamples all if None)
         """
-        with self.lock:
-            # Work with a copy of tick data
-            if symbol:
-                tick_data = self.tick_data[self.tick_data['symbol'] == symbol].copy(
-                )
-            else:
-                tick_data = self.tick_data.copy()
+        with self._resample_lock:
+            # Materialize buffered ticks (already a fresh DataFrame)
+            tick_data = self._ticks_frame(symbol)
 
             if tick_data.empty:
                 return
 
-            # Set timestamp as index for resampling
-            tick_data = tick_data.set_index('timestamp')
-
-            # Define resampling rules
-            resample_rules = {
-                '1s': '1s',
-                '1min': '1min',
-                '5min': '5min'
-            }
+            # Column arrays once for all timeframes, timestamps as int64 ns
+            ts_all = tick_data['timestamp'].values.astype('datetime64[ns]').view('i8')
+            # Group on the categorical codes, names only for the output bars
+            sym_all = tick_data['symbol'].cat.codes.to_numpy()
+            sym_names = tick_data['symbol'].cat.categories.to_numpy(dtype=object)
+            px_all = tick_data['price'].to_numpy(dtype=np.float64)
+            qty_all = tick_data['quantity'].to_numpy(dtype=np.float64)
 
             # Perform resampling for each timeframe
-            for timeframe_key, rule in resample_rules.items():
+            for timeframe_key, bucket_ns in BUCKET_NS.items():
                 try:
+                    # Only re-aggregate each symbol's ticks from its last
+                    # open bar onwards, symbols never resampled keep all ticks
+                    watermarks = self._last_resampled_ts[timeframe_key]
+                    if watermarks:
+                        since = np.full(len(sym_names), np.iinfo(np.int64).min, dtype=np.int64)
+                        for code, last_ts in watermarks.items():
+                            if code < len(since):
+                                since[code] = last_ts
+                        keep = ts_all >= since[sym_all]
+                        ts, sym, px, qty = ts_all[keep], sym_all[keep], px_all[keep], qty_all[keep]
+                    else:
+                        ts, sym, px, qty = ts_all, sym_all, px_all, qty_all
+                    if len(ts) == 0:
+                        continue
+
                     # Resample using OHLCV (Open, High, Low, Close, Volume)
-                    if not tick_data.empty:
-                        # Group by symbol and resample price data
-                        price_resampled = tick_data.groupby('symbol')['price'].resample(rule).agg({
-                            'open': 'first',
-                            'high': 'max',
-                            'low': 'min',
-                            'close': 'last'
-                        })
-
-                        # Resample volume data
-                        volume_resampled = tick_data.groupby(
-                            'symbol')['quantity'].resample(rule).sum()
-
-                        # Combine price and volume data
-                        if not price_resampled.empty and not volume_resampled.empty:
-                            # Flatten multi-index
-                            price_df = price_resampled.reset_index()
-                            volume_df = volume_resampled.reset_index()
-
-                            # Merge on timestamp and symbol
-                            resampled_df = pd.merge(price_df, volume_df, on=[
-                                                    'timestamp', 'symbol'])
-                            resampled_df.rename(
-                                columns={'quantity': 'volume'}, inplace=True)
-
-                            # Update stored resampled data
-                            if self.resampled_data[timeframe_key].empty:
-                                self.resampled_data[timeframe_key] = resampled_df
-                            else:
-                                # Concatenate and remove duplicates
-                                combined = pd.concat([
-                                    self.resampled_data[timeframe_key],
-                                    resampled_df
-                                ])
-                                self.resampled_data[timeframe_key] = combined.drop_duplicates(
-                                    subset=['timestamp', 'symbol'], keep='last'
-                                )
-
-                            # Keep only recent data
-                            if len(self.resampled_data[timeframe_key]) > 2000:
-                                self.resampled_data[timeframe_key] = self.resampled_data[timeframe_key].tail(
-                                    1000)
-
-                            # Save to database if enabled
-                            if self.conn:
-                                table_name = f'resampled_{timeframe_key}'
-                                # Only insert new data
-                                resampled_df.to_sql(
-                                    table_name, self.conn, if_exists='append', index=False)
+                    if _HAS_NUMBA:
+                        resampled_df = self._resample_numba(ts, sym, px, qty, bucket_ns)
+                    else:
+                        resampled_df = self._resample_numpy(ts, sym, px, qty, bucket_ns)
+                    resampled_df['symbol'] = sym_names[resampled_df['symbol'].to_numpy()]
+
+                    if not resampled_df.empty:
+                        # New bars overwrite stored bars with the same
+                        # (timestamp, symbol) in place, the ring drops the oldest
+                        last = self._upsert_bars(timeframe_key, resampled_df)
+
+                        # Each resampled symbol's latest bar may still be
+                        # open, its next pass restarts from there
+                        for code in np.unique(sym).tolist():
+                            if code in last:
+                                watermarks[code] = last[code]
+
+                        # Save to database if enabled
+                        if self.conn:
+                            with self.lock:
+                                self._queue_rows(f'resampled_{timeframe_key}', (
+                                    _db_timestamps(
+                                        resampled_df['timestamp'].values),
+                                    *(resampled_df[col].to_numpy() for col in OHLCV_COLUMNS[1:])))
 
                 except Exception as e:
                     print(f"Error resampling {timeframe_key}: {e}")
@@ -217,6 +466,222 @@ class DataStore:
             for key in self.last_resample:
                 self.last_resample[key] = current_time
 
+    @staticmethod
+    def _new_ohlcv_ring(capacity: int) -> dict:
+        """
+        Empty SoA ring for one timeframe
+
+        Args:
+            capacity: Number of bars kept
+
+        Returns:
+            Dict with column arrays (ts as int64 ns, sym as int32 code, o/h/l/c/v),
+            head (next write slot), size, slots ((ts, code) -> slot), last
+            (code -> latest bar ts) and frame (cached materialization or None)
+        """
+        return {
+            'ts': np.empty(capacity, dtype=np.int64),
+            'sym': np.empty(capacity, dtype=np.int32),
+            'o': np.empty(capacity, dtype=np.float64),
+            'h': np.empty(capacity, dtype=np.float64),
+            'l': np.empty(capacity, dtype=np.float64),
+            'c': np.empty(capacity, dtype=np.float64),
+            'v': np.empty(capacity, dtype=np.float64),
+            'head': 0,
+            'size': 0,
+            'slots': {},
+            'last': {},
+            'frame': None
+        }
+
+    def _sym_code(self, symbol: str) -> int:
+        """Int code of a symbol, assigned on first sight"""
+        code = self._sym_codes.get(symbol)
+        if code is None:
+            with self._sym_lock:
+                code = self._sym_codes.get(symbol)
+                if code is None:
+                    # Name first, readers map codes through _sym_names
+                    code = len(self._sym_names)
+                    self._sym_names.append(symbol)
+                    self._sym_codes[symbol] = code
+        return code
+
+    def _upsert_bars(self, timeframe: str, bars: pd.DataFrame) -> dict:
+        """
+        Write bars into a timeframe's ring, updating existing bars in place
+
+        Args:
+            timeframe: One of '1s', '1min', '5min'
+            bars: DataFrame with OHLCV_COLUMNS
+
+        Returns:
+            The ring's symbol code -> latest bar timestamp (ns) mapping
+        """
+        ring = self._ohlcv_ring[timeframe]
+        cap = self._resampled_cap
+        ts_new = bars['timestamp'].values.astype('datetime64[ns]').view('i8')
+        codes = np.array([self._sym_code(sym) for sym in bars['symbol']], dtype=np.int32)
+        values = [bars[col].to_numpy(dtype=np.float64) for col in OHLCV_COLUMNS[2:]]
+        columns = [ring[key] for key in ('o', 'h', 'l', 'c', 'v')]
+
+        # Insert oldest first so ring eviction follows time
+        order = np.lexsort((codes, ts_new))
+
+        with self._ohlcv_lock:
+            slots, last = ring['slots'], ring['last']
+            for j in order.tolist():
+                t, code = int(ts_new[j]), int(codes[j])
+                i = slots.get((t, code))
+                if i is None:
+                    i = ring['head']
+                    if ring['size'] == cap:
+                        # Evict the oldest bar in this slot
+                        old = (int(ring['ts'][i]), int(ring['sym'][i]))
+                        del slots[old]
+                        if last.get(old[1]) == old[0]:
+                            del last[old[1]]
+                    else:
+                        ring['size'] += 1
+                    ring['head'] = (i + 1) % cap
+                    slots[(t, code)] = i
+                    ring['ts'][i] = t
+                    ring['sym'][i] = code
+                for column, value in zip(columns, values):
+                    column[i] = value[j]
+                if code not in last or t > last[code]:
+                    last[code] = t
+            ring['frame'] = None
+            return dict(last)
+
+    def _ohlcv_frame(self, timeframe: str) -> tuple:
+        """
+        Materialize a timeframe's ring, cached until the next update
+
+        Args:
+            timeframe: One of '1s', '1min', '5min'
+
+        Returns:
+            Tuple of (DataFrame sorted by (timestamp, symbol), {symbol: row positions})
+        """
+        ring = self._ohlcv_ring[timeframe]
+        cached = ring['frame']
+        if cached is not None:
+            return cached
+
+        with self._ohlcv_lock:
+            if ring['frame'] is None:
+                size, cap = ring['size'], self._resampled_cap
+                if size < cap:
+                    order = np.arange(size)
+                else:
+                    order = np.arange(ring['head'], ring['head'] + cap) % cap
+
+                # Sort by (timestamp, symbol name) like the bars were resampled
+                names = np.array(self._sym_names, dtype=object)
+                name_rank = np.argsort(np.argsort(names))
+                order = order[np.lexsort((name_rank[ring['sym'][order]], ring['ts'][order]))]
+
+                frame = pd.DataFrame({
+                    'timestamp': ring['ts'][order].view('datetime64[ns]'),
+                    'symbol': names[ring['sym'][order]],
+                    'open': ring['o'][order],
+                    'high': ring['h'][order],
+                    'low': ring['l'][order],
+                    'close': ring['c'][order],
+                    'volume': ring['v'][order]
+                })
+                ring['frame'] = (frame, frame.groupby('symbol').indices)
+            return ring['frame']
+
+    @property
+    def resampled_data(self) -> Dict[str, pd.DataFrame]:
+        """Resampled bars per timeframe, sorted by (timestamp, symbol)"""
+        return {tf: self._ohlcv_frame(tf)[0] for tf in self._ohlcv_ring}
+
+    @staticmethod
+    def _resample_numba(ts_all: np.ndarray, sym_all: np.ndarray, px_all: np.ndarray,
+                        qty_all: np.ndarray, bucket_ns: int) -> pd.DataFrame:
+        """
+        Per-symbol OHLCV bars from the compiled bucket kernel
+
+        Args:
+            ts_all: Tick timestamps as int64 ns
+            sym_all: Tick symbol codes
+            px_all: Tick prices (float64)
+            qty_all: Tick quantities (float64)
+            bucket_ns: Bar width in ns, see BUCKET_NS
+
+        Returns:
+            DataFrame with columns symbol (code), timestamp, open, high, low,
+            close, volume, per symbol in time order including empty bars
+        """
+        symbols, inverse = np.unique(sym_all, return_inverse=True)
+
+        frames = []
+        for i, sym in enumerate(symbols):
+            mask = inverse == i
+            ts, px, qty = ts_all[mask], px_all[mask], qty_all[mask]
+            if len(ts) > 1 and (np.diff(ts) < 0).any():
+                order = np.argsort(ts, kind='stable')
+                ts, px, qty = ts[order], px[order], qty[order]
+            starts, o, h, l, c, v = ohlcv_bucket(ts, px, qty, bucket_ns)
+            frames.append(pd.DataFrame({
+                'symbol': sym,
+                'timestamp': starts.view('datetime64[ns]'),
+                'open': o, 'high': h, 'low': l, 'close': c, 'volume': v
+            }))
+
+        return pd.concat(frames, ignore_index=True)
+
+    @staticmethod
+    def _resample_numpy(ts: np.ndarray, sym: np.ndarray, px: np.ndarray,
+                        qty: np.ndarray, bucket_ns: int) -> pd.DataFrame:
+        """
+        Per-symbol OHLCV bars with integer bucketing and ufunc reduceat
+
+        Same arguments and result as _resample_numba.
+        """
+        symbols, codes = np.unique(sym, return_inverse=True)
+        order = np.lexsort((ts, codes))
+        codes, px, qty = codes[order], px[order], qty[order]
+        buckets = ts[order] // bucket_ns
+
+        # One group per (symbol, bucket) run in the sorted ticks
+        edges = np.flatnonzero(np.r_[True, (codes[1:] != codes[:-1])
+                                     | (buckets[1:] != buckets[:-1])])
+        g_code = codes[edges]
+        g_bucket = buckets[edges]
+
+        # Every bucket between a symbol's first and last tick gets a row,
+        # empty ones keep NaN prices and zero volume like pandas resample
+        first = np.full(len(symbols), np.iinfo(np.int64).max)
+        last = np.full(len(symbols), np.iinfo(np.int64).min)
+        np.minimum.at(first, g_code, g_bucket)
+        np.maximum.at(last, g_code, g_bucket)
+        counts = last - first + 1
+        offsets = np.cumsum(counts) - counts
+        n = int(counts.sum())
+        rows = offsets[g_code] + (g_bucket - first[g_code])
+
+        out_bucket = np.arange(n) - np.repeat(offsets, counts) + np.repeat(first, counts)
+        o = np.full(n, np.nan)
+        h = np.full(n, np.nan)
+        l = np.full(n, np.nan)
+        c = np.full(n, np.nan)
+        v = np.zeros(n)
+        o[rows] = px[edges]
+        c[rows] = px[np.r_[edges[1:], len(px)] - 1]
+        h[rows] = np.maximum.reduceat(px, edges)
+        l[rows] = np.minimum.reduceat(px, edges)
+        v[rows] = np.add.reduceat(qty, edges)
+
+        return pd.DataFrame({
+            'symbol': np.repeat(symbols, counts),
+            'timestamp': (out_bucket * bucket_ns).view('datetime64[ns]'),
+            'open': o, 'high': h, 'low': l, 'close': c, 'volume': v
+        })
+
     def get_resampled_data(self, timeframe: str, symbol: str = None) -> pd.DataFrame:
         """
         Get resampled data for a specific timeframe
@@ -228,18 +693,19 @@ class DataStore:
         Returns:
             DataFrame with resampled data
         """
-        if timeframe not in self.resampled_data:
+        if timeframe not in self._ohlcv_ring:
             raise ValueError(
                 f"Invalid timeframe: {timeframe}. Use '1s', '1min', or '5min'")
 
-        with self.lock:
-            data = self.resampled_data[timeframe].copy()
-            if symbol and not data.empty:
-                data = data[data['symbol'] == symbol]
-            # Return empty DataFrame with correct columns if no data
-            if data.empty:
-                return pd.DataFrame(columns=['timestamp', 'symbol', 'open', 'high', 'low', 'close', 'volume'])
-            return data.sort_values('timestamp').reset_index(drop=True) if 'timestamp' in data.columns else data
+        # Materialized frames are already sorted and never modified in place,
+        # no copy or sort needed
+        data, rows = self._ohlcv_frame(timeframe)
+        if symbol and not data.empty:
+            data = data.take(rows.get(symbol, [])).reset_index(drop=True)
+        # Return empty DataFrame with correct columns if no data
+        if data.empty:
+            return pd.DataFrame(columns=['timestamp', 'symbol', 'open', 'high', 'low', 'close', 'volume'])
+        return data
 
     def save_to_csv(self, filepath: str, timeframe: str = None):
         """
@@ -249,17 +715,18 @@ class DataStore:
             filepath: Path to save CSV file
             timeframe: Timeframe to save ('1s', '1min', '5min') or None for raw ticks
         """
-        with self.lock:
-            if timeframe:
-                data = self.get_resampled_data(timeframe)
-            else:
-                data = self.tick_data.copy()
+        if timeframe:
+            data = self.get_resampled_data(timeframe)
+        else:
+            data = self._ticks_frame()
 
-            data.to_csv(filepath, index=False)
+        write_csv(data, filepath)
 
     def close(self):
-        """Close database connection"""
+        """Write any queued rows and close database connection"""
         if self.conn:
+            with self.lock:
+                self._flush_pending()
             self.conn.close()
 
 